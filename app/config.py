@@ -1,3 +1,4 @@
+from functools import cached_property
 from typing import Dict, List, Optional
 
 from pydantic import Field
@@ -20,6 +21,11 @@ class Settings(BaseSettings):
         ]
     )
 
+    @cached_property
+    def GLOBAL_LLM_CONFIGS_BY_ID(self) -> Dict[int, Dict]:
+        """Index of GLOBAL_LLM_CONFIGS by config ID, built once on first access."""
+        return {cfg["id"]: cfg for cfg in self.GLOBAL_LLM_CONFIGS}
+
     # API Keys (optional, can be loaded from environment)
     OPENAI_API_KEY: Optional[str] = None
     ANTHROPIC_API_KEY: Optional[str] = None
@@ -1,14 +1,29 @@
 import enum
 from typing import Any, Dict, Optional
 
-from sqlalchemy import Integer, String, JSON, Enum as SAEnum, ForeignKey
+from sqlalchemy import Integer, String, JSON, Enum as SAEnum, ForeignKey, event
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 from app.config import config
 
 # Create Async Engine
-engine = create_async_engine(config.DATABASE_URL, echo=False)
+# query_cache_size raises SQLAlchemy's compiled-statement LRU above the
+# default 500 so hot lookups stay compiled.
+engine = create_async_engine(config.DATABASE_URL, echo=False, query_cache_size=1200)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+        # WAL lets readers proceed while a writer commits, and NORMAL sync
+        # drops the per-transaction fsync that FULL requires under WAL.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
 
 # Create Async Session Factory
 AsyncSessionLocal = async_sessionmaker(
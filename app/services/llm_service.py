@@ -1,24 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import importlib.util
 import logging
+import time
 from enum import Enum
-from typing import List, Union
+from functools import lru_cache, partial
+from hashlib import blake2b
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, List, Mapping, Union
 
+import httpx
 import litellm
+from cachetools import TTLCache
 from litellm import embedding as litellm_embedding
-from langchain_core.messages import HumanMessage
-from langchain_community.chat_models import ChatLiteLLM
+from sqlalchemy import and_, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.config import config
-from app.db import LLMConfig, SearchSpace
+from app.db import LLMConfig, ProviderType, SearchSpace
+
+if TYPE_CHECKING:
+    from langchain_community.chat_models import ChatLiteLLM
+
+logger = logging.getLogger(__name__)
+
+# langchain is slow to import, so its classes are only loaded on first use.
+# They are still reachable as module attributes (e.g. llm_service.ChatLiteLLM).
+_LAZY_IMPORTS: Mapping[str, tuple[str, str]] = MappingProxyType({
+    "ChatLiteLLM": ("langchain_community.chat_models", "ChatLiteLLM"),
+    "HumanMessage": ("langchain_core.messages", "HumanMessage"),
+})
+
+
+def __getattr__(name: str) -> Any:
+    target = _LAZY_IMPORTS.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attr_name = target
+    value = getattr(importlib.import_module(module_name), attr_name)
+    globals()[name] = value
+    return value
+
+
+def _lazy_import(name: str) -> Any:
+    """Return a lazily imported class, importing it on first access."""
+    value = globals().get(name)
+    return value if value is not None else __getattr__(name)
 
 # Configure litellm to automatically drop unsupported parameters
 litellm.drop_params = True
 
-logger = logging.getLogger(__name__)
+# Shared HTTP client for litellm's async calls. The default pool caps out
+# around 100 connections, which throttles concurrent LLM fan-out.
+# An httpx.AsyncClient's connection pool belongs to the event loop it was
+# first used on, so the client is created by an explicit startup hook on the
+# app's loop and closed by the matching shutdown hook, never at import time.
+_HTTP_CLIENT: httpx.AsyncClient | None = None
+_HTTP_CLIENT_LOOP: asyncio.AbstractEventLoop | None = None
+_PREVIOUS_ACLIENT_SESSION: Any = None
+
 
+async def start_http_client() -> httpx.AsyncClient:
+    """
+    App-startup hook: create the shared high-limit client on the running loop
+    and install it as ``litellm.aclient_session``. Idempotent per loop.
+    HTTP/2 is only enabled when the optional `h2` package is installed.
+    """
+    global _HTTP_CLIENT, _HTTP_CLIENT_LOOP, _PREVIOUS_ACLIENT_SESSION
+
+    loop = asyncio.get_running_loop()
+    if _HTTP_CLIENT is not None and not _HTTP_CLIENT.is_closed and _HTTP_CLIENT_LOOP is loop:
+        return _HTTP_CLIENT
+
+    if _HTTP_CLIENT is None:
+        _PREVIOUS_ACLIENT_SESSION = litellm.aclient_session
+    elif not _HTTP_CLIENT.is_closed:
+        # Its pool is bound to another (likely closed) loop and can't be
+        # closed from here; drop it rather than reuse it.
+        logger.warning("Replacing shared HTTP client created on another event loop")
+
+    _HTTP_CLIENT = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=2000, max_keepalive_connections=1500),
+        timeout=httpx.Timeout(120.0),
+        http2=importlib.util.find_spec("h2") is not None,
+    )
+    _HTTP_CLIENT_LOOP = loop
+    litellm.aclient_session = _HTTP_CLIENT
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """
+    App-shutdown hook matching start_http_client: close the shared client on
+    the loop it was created on and restore litellm's previous session.
+    """
+    global _HTTP_CLIENT, _HTTP_CLIENT_LOOP, _PREVIOUS_ACLIENT_SESSION
+
+    client = _HTTP_CLIENT
+    if client is None:
+        return
+
+    if litellm.aclient_session is client:
+        litellm.aclient_session = _PREVIOUS_ACLIENT_SESSION
+    _HTTP_CLIENT = None
+    _HTTP_CLIENT_LOOP = None
+    _PREVIOUS_ACLIENT_SESSION = None
+    await client.aclose()
 
-PROVIDER_MAP = {
+
+PROVIDER_MAP: Mapping[str, str] = MappingProxyType({
     "OPENAI": "openai",
     "ANTHROPIC": "anthropic",
     "GROQ": "groq",
@@ -49,15 +143,49 @@ PROVIDER_MAP = {
     "ALIBABA_QWEN": "openai",
     "MOONSHOT": "openai",
     "ZHIPU": "openai",
-}
-
-
+})
+
+# litellm prefix for every accepted spelling of a known provider: the
+# ProviderType member itself, its upper-case value and its lower-case value.
+_PROVIDER_PREFIXES: Mapping[str | Enum, str] = MappingProxyType({
+    key: PROVIDER_MAP.get(p.value, p.value.lower())
+    for p in ProviderType
+    for key in (p, p.value, p.value.lower())
+})
+
+# Constructed ChatLiteLLM instances keyed by (search_space_id, role).
+# Values are (expires_at, instance) using time.monotonic() timestamps.
+LLM_INSTANCE_CACHE_TTL_SECONDS = 300.0
+LLM_INSTANCE_CACHE_MAX_ENTRIES = 256
+_LLM_INSTANCE_CACHE: dict[tuple[int, str], tuple[float, ChatLiteLLM]] = {}
+_LLM_INSTANCE_CACHE_LOCK = asyncio.Lock()
+
+# ChatLiteLLM constructors with global config kwargs pre-bound, keyed by config ID
+_GLOBAL_LLM_BUILDERS: dict[int, Callable[..., ChatLiteLLM]] = {}
+
+# Embedding vectors keyed by (model_string, api_base, digest of the input text)
+EMBEDDING_CACHE_TTL_SECONDS = 3600
+_EMBEDDING_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=EMBEDDING_CACHE_TTL_SECONDS)
+_EMBEDDING_CACHE_LOCK = asyncio.Lock()
+
+# Outcomes of validate_llm_config keyed by a digest of the full config.
+# Only definitive results (success, bad credentials) are stored.
+VALIDATION_CACHE_TTL_SECONDS = 600
+_VALIDATION_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=VALIDATION_CACHE_TTL_SECONDS)
+
+
+@lru_cache(maxsize=1024)
 def _build_model_string(
     model_name: str,
     provider: str | Enum,
     custom_provider: str | None = None,
 ) -> str:
-    """Create a litellm model string with provider alias normalization."""
+    """
+    Create a litellm model string with provider alias normalization.
+
+    Results are memoized since the same few (model, provider) pairs are
+    resolved on every LLM and embedding lookup.
+    """
     if custom_provider:
         return f"{custom_provider}/{model_name}"
 
@@ -65,9 +193,17 @@ def _build_model_string(
     if "/" in model_name:
         return model_name
 
+    return f"{_provider_prefix(provider)}/{model_name}"
+
+
+def _provider_prefix(provider: str | Enum) -> str:
+    """Resolve the litellm provider prefix, with a single lookup for known providers."""
+    provider_prefix = _PROVIDER_PREFIXES.get(provider)
+    if provider_prefix is not None:
+        return provider_prefix
+
     provider_name = provider.value if isinstance(provider, Enum) else str(provider)
-    provider_prefix = PROVIDER_MAP.get(provider_name.upper(), provider_name.lower())
-    return f"{provider_prefix}/{model_name}"
+    return PROVIDER_MAP.get(provider_name.upper(), provider_name.lower())
 
 
 class LLMRole:
@@ -76,6 +212,39 @@ class LLMRole:
     STRATEGIC = "strategic"
 
 
+_ROLE_LLM_ID_ATTRS: Mapping[str, str] = MappingProxyType({
+    LLMRole.LONG_CONTEXT: "long_context_llm_id",
+    LLMRole.FAST: "fast_llm_id",
+    LLMRole.STRATEGIC: "strategic_llm_id",
+})
+
+
+def _search_space_llm_stmt(llm_id_attr: str):
+    """
+    Build the SearchSpace + LLMConfig lookup for one role.
+
+    Global configs (negative IDs) never match a row, so the outer join
+    simply yields None for them.
+    """
+    return (
+        select(SearchSpace, LLMConfig)
+        .outerjoin(
+            LLMConfig,
+            and_(
+                LLMConfig.id == getattr(SearchSpace, llm_id_attr),
+                LLMConfig.search_space_id == SearchSpace.id,
+            ),
+        )
+        .where(SearchSpace.id == bindparam("search_space_id"))
+    )
+
+
+# Statements are built once so each execution reuses the same cache key
+_SEARCH_SPACE_LLM_STMTS = MappingProxyType({
+    role: _search_space_llm_stmt(attr) for role, attr in _ROLE_LLM_ID_ATTRS.items()
+})
+
+
 def get_global_llm_config(llm_config_id: int) -> dict | None:
     """
     Get a global LLM configuration by ID.
@@ -90,11 +259,59 @@ def get_global_llm_config(llm_config_id: int) -> dict | None:
     if llm_config_id >= 0:
         return None
 
-    for cfg in config.GLOBAL_LLM_CONFIGS:
-        if cfg.get("id") == llm_config_id:
-            return cfg
+    return config.GLOBAL_LLM_CONFIGS_BY_ID.get(llm_config_id)
+
+
+def _validation_fingerprint(
+    provider: str | Enum,
+    model_name: str,
+    api_key: str,
+    api_base: str | None,
+    custom_provider: str | None,
+    litellm_params: dict | None,
+) -> bytes:
+    """Digest an LLM config so the raw API key is never kept as a cache key."""
+    params = tuple(sorted((litellm_params or {}).items()))
+    payload = repr((provider, model_name, api_key, api_base, custom_provider, params))
+    return blake2b(payload.encode(), digest_size=16).digest()
+
+
+def _get_global_llm_builder(llm_config_id: int) -> Callable[..., ChatLiteLLM] | None:
+    """
+    Get a ChatLiteLLM constructor with a global config's arguments pre-bound.
+
+    Global configs are fixed for the life of the process, so the model string
+    and kwargs are resolved once per config ID; callers only supply metadata.
+    """
+    builder = _GLOBAL_LLM_BUILDERS.get(llm_config_id)
+    if builder is not None:
+        return builder
+
+    global_config = get_global_llm_config(llm_config_id)
+    if not global_config:
+        return None
+
+    # Build model string for global config
+    model_string = _build_model_string(
+        model_name=global_config["model_name"],
+        provider=global_config["provider"],
+        custom_provider=global_config.get("custom_provider"),
+    )
+
+    litellm_kwargs = {
+        "model": model_string,
+        "api_key": global_config["api_key"],
+    }
+
+    if global_config.get("api_base"):
+        litellm_kwargs["api_base"] = global_config["api_base"]
 
-    return None
+    if global_config.get("litellm_params"):
+        litellm_kwargs.update(global_config["litellm_params"])
+
+    builder = partial(_lazy_import("ChatLiteLLM"), **litellm_kwargs)
+    _GLOBAL_LLM_BUILDERS[llm_config_id] = builder
+    return builder
 
 
 async def validate_llm_config(
@@ -120,7 +337,18 @@ async def validate_llm_config(
         Tuple of (is_valid, error_message)
         - is_valid: True if config works, False otherwise
         - error_message: Empty string if valid, error description if invalid
+
+    Successful and authentication-failed results are cached for
+    VALIDATION_CACHE_TTL_SECONDS, so re-validating an unchanged config does
+    not repeat the paid test call.
     """
+    fingerprint = _validation_fingerprint(
+        provider, model_name, api_key, api_base, custom_provider, litellm_params
+    )
+    cached = _VALIDATION_CACHE.get(fingerprint)
+    if cached is not None:
+        return cached
+
     try:
         # Build the model string for litellm
         model_string = _build_model_string(
@@ -144,15 +372,16 @@ async def validate_llm_config(
         if litellm_params:
             litellm_kwargs.update(litellm_params)
 
-        llm = ChatLiteLLM(**litellm_kwargs)
+        llm = _lazy_import("ChatLiteLLM")(**litellm_kwargs)
 
         # Make a simple test call
-        test_message = HumanMessage(content="Hello")
+        test_message = _lazy_import("HumanMessage")(content="Hello")
         response = await llm.ainvoke([test_message])
 
         # If we got here without exception, the config is valid
         if response and response.content:
             logger.info(f"Successfully validated LLM config for model: {model_string}")
+            _VALIDATION_CACHE[fingerprint] = (True, "")
             return True, ""
         else:
             logger.warning(
@@ -161,7 +390,9 @@ async def validate_llm_config(
             return False, "LLM returned an empty response"
 
     except litellm.AuthenticationError:
-        return False, "Authentication failed: Invalid API Key"
+        result = (False, "Authentication failed: Invalid API Key")
+        _VALIDATION_CACHE[fingerprint] = result
+        return result
     except litellm.RateLimitError:
         return False, "Rate limit exceeded for this model"
     except Exception as e:
@@ -170,6 +401,15 @@ async def validate_llm_config(
         return False, error_msg
 
 
+def _embedding_text_digest(text: Union[str, List[str]]) -> bytes:
+    """Hash embedding input into a compact, fixed-size cache key component."""
+    if isinstance(text, str):
+        payload = text.encode()
+    else:
+        payload = b"\x00".join(t.encode() for t in text)
+    return blake2b(payload, digest_size=16).digest()
+
+
 async def get_text_embedding(
     text: Union[str, List[str]],
     model_name: str,
@@ -198,22 +438,55 @@ async def get_text_embedding(
             provider=provider,
         )
 
-        response = litellm_embedding(
-            model=model_string,
-            input=text,
-            api_key=api_key,
-            api_base=api_base
-        )
+        cache_key = (model_string, api_base, _embedding_text_digest(text))
+        async with _EMBEDDING_CACHE_LOCK:
+            data = _EMBEDDING_CACHE.get(cache_key)
+
+        if data is None:
+            # litellm.embedding is synchronous; keep it off the event loop
+            response = await asyncio.to_thread(
+                litellm_embedding,
+                model=model_string,
+                input=text,
+                api_key=api_key,
+                api_base=api_base
+            )
+
+            # Cache immutable copies so callers can't mutate a shared entry
+            data = tuple(tuple(r['embedding']) for r in response['data'])
+            async with _EMBEDDING_CACHE_LOCK:
+                _EMBEDDING_CACHE[cache_key] = data
 
-        # Return list of embeddings
-        data = [r['embedding'] for r in response['data']]
-        return data[0] if isinstance(text, str) else data
+        # Return list of embeddings, fresh lists on every call
+        if isinstance(text, str):
+            return list(data[0])
+        return [list(embedding) for embedding in data]
 
     except Exception as e:
         logger.error(f"Embedding generation failed: {e}")
         raise e
 
 
+async def invalidate_llm_cache(search_space_id: int, role: str | None = None) -> None:
+    """
+    Drop cached ChatLiteLLM instances for a search space.
+
+    Call this whenever a search space's LLM preferences or one of its
+    LLMConfig rows change so the next lookup rebuilds the instance.
+
+    Args:
+        search_space_id: Search Space ID
+        role: Optional LLM role; when omitted all roles are invalidated
+    """
+    async with _LLM_INSTANCE_CACHE_LOCK:
+        if role is not None:
+            _LLM_INSTANCE_CACHE.pop((search_space_id, role), None)
+            return
+
+        for key in [k for k in _LLM_INSTANCE_CACHE if k[0] == search_space_id]:
+            del _LLM_INSTANCE_CACHE[key]
+
+
 async def get_search_space_llm_instance(
     session: AsyncSession, search_space_id: int, role: str
 ) -> ChatLiteLLM | None:
@@ -221,6 +494,8 @@ async def get_search_space_llm_instance(
     Get a ChatLiteLLM instance for a specific search space and role.
 
     LLM preferences are stored at the search space level and shared by all members.
+    Instances are cached per (search_space_id, role) for
+    LLM_INSTANCE_CACHE_TTL_SECONDS; use invalidate_llm_cache() after updates.
 
     Args:
         session: Database session
@@ -230,28 +505,55 @@ async def get_search_space_llm_instance(
     Returns:
         ChatLiteLLM instance or None if not found
     """
+    cache_key = (search_space_id, role)
+
+    async with _LLM_INSTANCE_CACHE_LOCK:
+        cached = _LLM_INSTANCE_CACHE.get(cache_key)
+        if cached is not None:
+            expires_at, llm = cached
+            if expires_at > time.monotonic():
+                return llm
+            del _LLM_INSTANCE_CACHE[cache_key]
+
+    llm = await _build_search_space_llm_instance(session, search_space_id, role)
+    if llm is None:
+        return None
+
+    async with _LLM_INSTANCE_CACHE_LOCK:
+        if len(_LLM_INSTANCE_CACHE) >= LLM_INSTANCE_CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (dicts preserve insertion order)
+            _LLM_INSTANCE_CACHE.pop(next(iter(_LLM_INSTANCE_CACHE)))
+        _LLM_INSTANCE_CACHE[cache_key] = (
+            time.monotonic() + LLM_INSTANCE_CACHE_TTL_SECONDS,
+            llm,
+        )
+
+    return llm
+
+
+async def _build_search_space_llm_instance(
+    session: AsyncSession, search_space_id: int, role: str
+) -> ChatLiteLLM | None:
+    """Load the LLM config for a search space role and build a ChatLiteLLM."""
+    # Resolve the SearchSpace column holding this role's LLM config ID
+    llm_id_attr = _ROLE_LLM_ID_ATTRS.get(role)
+    if llm_id_attr is None:
+        logger.error(f"Invalid LLM role: {role}")
+        return None
+
     try:
-        # Get the search space with its LLM preferences
+        # Load the search space and its user-specific LLM config in one round-trip
         result = await session.execute(
-            select(SearchSpace).where(SearchSpace.id == search_space_id)
+            _SEARCH_SPACE_LLM_STMTS[role], {"search_space_id": search_space_id}
         )
-        search_space = result.scalars().first()
+        row = result.first()
 
-        if not search_space:
+        if not row:
             logger.error(f"Search space {search_space_id} not found")
             return None
 
-        # Get the appropriate LLM config ID based on role
-        llm_config_id = None
-        if role == LLMRole.LONG_CONTEXT:
-            llm_config_id = search_space.long_context_llm_id
-        elif role == LLMRole.FAST:
-            llm_config_id = search_space.fast_llm_id
-        elif role == LLMRole.STRATEGIC:
-            llm_config_id = search_space.strategic_llm_id
-        else:
-            logger.error(f"Invalid LLM role: {role}")
-            return None
+        search_space, llm_config = row
+        llm_config_id = getattr(search_space, llm_id_attr)
 
         if not llm_config_id:
             logger.error(f"No {role} LLM configured for search space {search_space_id}")
@@ -259,45 +561,18 @@ async def get_search_space_llm_instance(
 
         # Check if this is a global config (negative ID)
         if llm_config_id < 0:
-            global_config = get_global_llm_config(llm_config_id)
-            if not global_config:
+            build_llm = _get_global_llm_builder(llm_config_id)
+            if build_llm is None:
                 logger.error(f"Global LLM config {llm_config_id} not found")
                 return None
 
-            # Build model string for global config
-            model_string = _build_model_string(
-                model_name=global_config["model_name"],
-                provider=global_config["provider"],
-                custom_provider=global_config.get("custom_provider"),
-            )
-
-            # Create ChatLiteLLM instance from global config
-            litellm_kwargs = {
-                "model": model_string,
-                "api_key": global_config["api_key"],
-                "metadata": {
+            return build_llm(
+                metadata={
                     "search_space_id": str(search_space_id),
                     "role": role,
                     "llm_config_id": str(llm_config_id)
                 }
-            }
-
-            if global_config.get("api_base"):
-                litellm_kwargs["api_base"] = global_config["api_base"]
-
-            if global_config.get("litellm_params"):
-                litellm_kwargs.update(global_config["litellm_params"])
-
-            return ChatLiteLLM(**litellm_kwargs)
-
-        # Get the LLM configuration from database (user-specific config)
-        result = await session.execute(
-            select(LLMConfig).where(
-                LLMConfig.id == llm_config_id,
-                LLMConfig.search_space_id == search_space_id,
             )
-        )
-        llm_config = result.scalars().first()
 
         if not llm_config:
             logger.error(
@@ -331,7 +606,7 @@ async def get_search_space_llm_instance(
         if llm_config.litellm_params:
             litellm_kwargs.update(llm_config.litellm_params)
 
-        return ChatLiteLLM(**litellm_kwargs)
+        return _lazy_import("ChatLiteLLM")(**litellm_kwargs)
 
     except Exception as e:
         logger.error(
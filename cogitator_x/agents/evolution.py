@@ -1,16 +1,23 @@
-from typing import List, Dict, Any
+import logging
+from collections import deque
+from typing import Deque, Dict, Any
 from ..core.models import Message, AgentRole
 from ..core.bus import AetherBus
 
+logger = logging.getLogger(__name__)
+
 class PangenesAgent:
     """
     The Evolution Agent of Cogitator-X.
     Implements the STaR (Self-Taught Reasoner) algorithm for recursive self-improvement.
     """
+    EVOLUTION_BATCH_SIZE = 5
+
     def __init__(self, bus: AetherBus):
         self.bus = bus
         self.role = AgentRole.EVOLUTION.value
-        self.wisdom_gems: List[Dict[str, Any]] = []
+        self.wisdom_gems: Deque[Dict[str, Any]] = deque(maxlen=self.EVOLUTION_BATCH_SIZE)
+        self._pending_gems = 0
 
         # Subscribe to completion events to harvest high-quality data
         self.bus.subscribe("query.response", self.harvest_wisdom)
@@ -27,7 +34,7 @@ class PangenesAgent:
 
         # In a real system, we check if answer == ground_truth
         # For this demo, we assume the PRM already validated it
-        print(f"[{self.role}] Harvesting wisdom from successful trace. Trace length: {len(trace)}")
+        logger.info("[%s] Harvesting wisdom from successful trace. Trace length: %d", self.role, len(trace))
 
         gem = {
             "query": query,
@@ -37,8 +44,10 @@ class PangenesAgent:
         }
 
         self.wisdom_gems.append(gem)
+        self._pending_gems += 1
 
-        if len(self.wisdom_gems) >= 5:
+        if self._pending_gems >= self.EVOLUTION_BATCH_SIZE:
+            self._pending_gems = 0
             await self.trigger_evolution_cycle()
 
     async def trigger_evolution_cycle(self):
@@ -46,9 +55,12 @@ class PangenesAgent:
         Phase 2: Fine-tune (Evolution).
         In a real system, this would trigger a GRPO/SFT training run.
         """
-        print(f"[{self.role}] Evolving... Processing {len(self.wisdom_gems)} wisdom gems into the next model generation.")
+        logger.info(
+            "[%s] Evolving... Processing %d wisdom gems into the next model generation.",
+            self.role, len(self.wisdom_gems),
+        )
         # Logic to trigger SFT/RL...
-        self.wisdom_gems = [] # Reset after cycle
+        self.wisdom_gems.clear() # Reset after cycle
 
         evolution_msg = Message(
             sender=self.role,
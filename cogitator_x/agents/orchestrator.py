@@ -1,10 +1,13 @@
 import asyncio
-from typing import Dict, Any, List
-from ..core.models import Message, ReasoningState, AgentRole
+import logging
+from typing import Dict, Any, List, Optional
+from ..core.models import Message, ReasoningState, AgentRole, ThoughtNode
 from ..core.bus import AetherBus
 from ..reasoning.mcts import MCTSReasoningEngine
 from ..reasoning.prm import ProcessRewardModel
 
+logger = logging.getLogger(__name__)
+
 class AgioSageAgent:
     """
     The Orchestrator of Cogitator-X.
@@ -14,19 +17,27 @@ class AgioSageAgent:
         self.bus = bus
         self.engine = engine
         self.role = AgentRole.ORCHESTRATOR.value
+        # Subtree under the last answer's first step, reused by follow-ups
+        self._carry_over_root: Optional[ThoughtNode] = None
 
         # Subscribe to query topics
         self.bus.subscribe("query.submit", self.handle_query)
 
     async def handle_query(self, message: Message):
         query = message.content.get("text", "")
-        print(f"[{self.role}] Received query: {query}")
+        logger.info("[%s] Received query: %s", self.role, query)
 
         state = ReasoningState(query=query)
+        if message.content.get("follow_up"):
+            # Take ownership in one step: a concurrent follow-up must not
+            # search (or prune) the same tree
+            state.thought_root, self._carry_over_root = self._carry_over_root, None
 
         # 1. System 2 Reasoning Phase (Hidden CoT via MCTS)
-        print(f"[{self.role}] Initiating System 2 reasoning (MCTS)...")
+        logger.info("[%s] Initiating System 2 reasoning (MCTS)...", self.role)
         best_path_nodes = await self.engine.run(state)
+        # Keep only the taken branch so the next turn can continue from it
+        self._carry_over_root = self.engine.reuse_tree(state, best_path_nodes)
 
         # 2. Extract final thought and generate response
         thoughts = [node.text for node in best_path_nodes]
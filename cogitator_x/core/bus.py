@@ -1,7 +1,7 @@
 import asyncio
 import inspect
-import uuid
-from typing import Callable, Dict, List, Any
+import itertools
+from typing import Callable, Dict, Any, Tuple
 from .models import Message
 
 class AetherBus:
@@ -10,49 +10,129 @@ class AetherBus:
     Uses a simple Pub/Sub pattern to connect AgioSage, Pangenes, and Tools.
     """
     def __init__(self):
-        self.subscribers: Dict[str, List[Callable]] = {}
+        # Callbacks are classified once at subscribe time so publish never
+        # has to inspect them. Dicts act as insertion-ordered sets; for sync
+        # callbacks the value records whether they may block.
+        self._sync_subs: Dict[str, Dict[Callable, bool]] = {}
+        self._async_subs: Dict[str, Dict[Callable, None]] = {}
+        # Immutable per-topic snapshots of (async, executor, inline) callbacks,
+        # rebuilt on (un)subscribe so publish iterates them without copying.
+        self._dispatch: Dict[str, Tuple[Tuple[Callable, ...], ...]] = {}
         self.futures: Dict[str, asyncio.Future] = {}
+        # Correlation ID -> id of the request message that created it, so
+        # the request itself is delivered to subscribers, not taken as a reply
+        self._request_message_ids: Dict[str, str] = {}
+        # Correlation IDs only need to be unique within this bus instance
+        self._next_correlation_id = itertools.count().__next__
 
-    def subscribe(self, topic: str, callback: Callable):
-        if topic not in self.subscribers:
-            self.subscribers[topic] = []
-        self.subscribers[topic].append(callback)
+    def subscribe(self, topic: str, callback: Callable, blocking: bool = True):
+        """
+        Register a callback for a topic.
+        Sync callbacks run in the default executor so they cannot stall the
+        event loop; pass blocking=False for cheap ones to run them inline.
+        """
+        if inspect.iscoroutinefunction(callback):
+            self._async_subs.setdefault(topic, {})[callback] = None
+        else:
+            self._sync_subs.setdefault(topic, {})[callback] = blocking
+        self._rebuild_dispatch(topic)
+
+    def unsubscribe(self, topic: str, callback: Callable):
+        for subs in (self._sync_subs, self._async_subs):
+            callbacks = subs.get(topic)
+            if callbacks and callback in callbacks:
+                del callbacks[callback]
+                if not callbacks:
+                    del subs[topic]
+                self._rebuild_dispatch(topic)
+                return
+
+    def _rebuild_dispatch(self, topic: str):
+        sync_callbacks = self._sync_subs.get(topic, {})
+        async_callbacks = self._async_subs.get(topic, {})
+        if not sync_callbacks and not async_callbacks:
+            self._dispatch.pop(topic, None)
+            return
+
+        self._dispatch[topic] = (
+            tuple(async_callbacks),
+            tuple(cb for cb, blocking in sync_callbacks.items() if blocking),
+            tuple(cb for cb, blocking in sync_callbacks.items() if not blocking),
+        )
 
     async def publish(self, message: Message):
-        correlation_id = message.content.get('correlation_id')
-        if correlation_id and correlation_id in self.futures:
-            future = self.futures.pop(correlation_id)
-            if not future.done():
-                future.set_result(message)
+        # Only look for a correlation ID while a request() is awaiting a reply
+        futures = self.futures
+        if (futures
+                and (correlation_id := message.content.get('correlation_id')) is not None
+                and message.id != self._request_message_ids.get(correlation_id)):
+            future = futures.pop(correlation_id, None)
+            if future is not None:
+                if not future.done():
+                    future.set_result(message)
+                return
+
+        dispatch = self._dispatch.get(message.topic)
+        if dispatch is None:
             return
 
-        topic = message.topic
-        if topic in self.subscribers:
-            tasks = []
-            for callback in self.subscribers[topic]:
-                if inspect.iscoroutinefunction(callback):
-                    tasks.append(callback(message))
-                else:
-                    # Run sync callback in a thread or just call it
-                    callback(message)
+        # Snapshots are immutable, so callbacks may (un)subscribe re-entrantly
+        async_callbacks, executor_callbacks, inline_callbacks = dispatch
+        pending = [callback(message) for callback in async_callbacks]
+        if executor_callbacks:
+            loop = asyncio.get_running_loop()
+            pending.extend(self._run_in_executor(loop, callback, message) for callback in executor_callbacks)
+        for callback in inline_callbacks:
+            # Callables that aren't coroutine functions (async __call__,
+            # lambdas wrapping coroutines) are caught by their return value
+            result = callback(message)
+            if asyncio.iscoroutine(result):
+                pending.append(result)
 
-            if tasks:
-                await asyncio.gather(*tasks)
+        if len(pending) == 1:
+            # A lone subscriber doesn't need gather's task wrapping
+            await pending[0]
+        elif pending:
+            await asyncio.gather(*pending)
 
-    async def request(self, topic: str, content: Dict[str, Any], timeout: float = 5.0) -> Message:
-        correlation_id = str(uuid.uuid4())
-        future = asyncio.Future()
-        self.futures[correlation_id] = future
+    @staticmethod
+    async def _run_in_executor(loop: asyncio.AbstractEventLoop, callback: Callable, message: Message):
+        result = await loop.run_in_executor(None, callback, message)
+        if asyncio.iscoroutine(result):
+            await result
 
+    async def request(self, topic: str, content: Dict[str, Any], timeout: float = 5.0) -> Message:
+        """
+        Publish a request and wait for a reply carrying its correlation_id.
+        `timeout` bounds the whole exchange: subscribers run in a task under
+        the same deadline and are cancelled if still running once it resolves.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        correlation_id = f"c{self._next_correlation_id():x}"
+        future = loop.create_future()
         request_message = Message(
             topic=topic,
             content={**content, 'correlation_id': correlation_id}
         )
+        self.futures[correlation_id] = future
+        self._request_message_ids[correlation_id] = request_message.id
 
-        await self.publish(request_message)
-
+        publish_task = asyncio.ensure_future(self.publish(request_message))
         try:
-            return await asyncio.wait_for(future, timeout=timeout)
-        except asyncio.TimeoutError:
+            await asyncio.wait((future, publish_task), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if publish_task.done() and not future.done():
+                # Surface subscriber errors, then keep waiting for a late reply
+                publish_task.result()
+                await asyncio.wait((future,), timeout=max(0.0, deadline - loop.time()))
+            if not future.done():
+                raise TimeoutError(f"Request to topic '{topic}' timed out.")
+            return future.result()
+        finally:
+            if not publish_task.done():
+                publish_task.cancel()
+            elif not publish_task.cancelled():
+                # A reply already won; don't leave a subscriber error unretrieved
+                publish_task.exception()
             self.futures.pop(correlation_id, None)
-            raise TimeoutError(f"Request to topic '{topic}' timed out.")
+            self._request_message_ids.pop(correlation_id, None)
@@ -1,9 +1,12 @@
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple
 from enum import Enum
 import uuid
 import math
 
+if TYPE_CHECKING:
+    import numpy as np
+
 class AgentRole(Enum):
     ORCHESTRATOR = "AgioSage"
     EVOLUTION = "Pangenes"
@@ -19,7 +22,7 @@ class Message:
     content: Dict[str, Any] = field(default_factory=dict)
     timestamp: float = 0.0
 
-@dataclass
+@dataclass(slots=True)
 class ThoughtNode:
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     text: str = ""
@@ -27,11 +30,18 @@ class ThoughtNode:
     is_hidden: bool = True
     parent_id: Optional[str] = None
     children: List['ThoughtNode'] = field(default_factory=list)
+    parent: Optional['ThoughtNode'] = field(default=None, repr=False, compare=False)
 
     # MCTS metrics
     visit_count: int = 0
     total_reward: float = 0.0
     prm_score: float = 0.0  # Step-level reward from PRM
+    on_going_count: int = 0  # In-flight simulations through this node (WU-UCT)
+    # Step text tokenized once at expansion, reused by every PRM scoring
+    token_ids: Optional['np.ndarray'] = field(default=None, repr=False, compare=False)
+    # Step texts above this node from before it was re-rooted for a follow-up
+    # turn; only set on a root, where the walk up the tree stops
+    context_path: Tuple[str, ...] = field(default=(), repr=False, compare=False)
 
     def get_value(self) -> float:
         if self.visit_count == 0:
@@ -39,12 +49,36 @@ class ThoughtNode:
         return self.total_reward / self.visit_count
 
     def ucb1(self, total_parent_visits: int, exploration_weight: float = 1.414) -> float:
-        if self.visit_count == 0:
+        """
+        WU-UCT score: in-flight simulations count as visits, so concurrent
+        selections spread out. `total_parent_visits` should likewise include
+        the parent's on_going_count. Uses log1p so a fresh parent is safe.
+        """
+        visits = self.visit_count + self.on_going_count
+        if visits == 0:
             return float('inf')
-        exploitation = self.get_value()
-        exploration = exploration_weight * math.sqrt(math.log(total_parent_visits) / self.visit_count)
+        exploitation = self.total_reward / visits
+        exploration = exploration_weight * math.sqrt(math.log1p(total_parent_visits) / visits)
         return exploitation + exploration
 
+    def select_child(self, exploration_weight: float = 1.414) -> Optional['ThoughtNode']:
+        """
+        Returns the child with the highest UCB1 score.
+        Equivalent to max(children, key=ucb1) but computes sqrt(log(N)) once
+        for all siblings instead of once per child.
+        """
+        c_sqrt_log_n = exploration_weight * math.sqrt(math.log1p(self.visit_count + self.on_going_count))
+        sqrt = math.sqrt
+        best, best_score = None, -math.inf
+        for child in self.children:
+            visits = child.visit_count + child.on_going_count
+            if visits == 0:
+                return child
+            score = child.total_reward / visits + c_sqrt_log_n / sqrt(visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
 @dataclass
 class ReasoningState:
     query: str = ""
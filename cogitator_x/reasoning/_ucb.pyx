@@ -0,0 +1,24 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+"""
+Compiled UCB1 argmax over sibling arrays; same contract as ucb.ucb_argmax.
+Optional: build in place with `cythonize -i cogitator_x/reasoning/_ucb.pyx`.
+"""
+from libc.math cimport sqrt
+
+cpdef Py_ssize_t select_best(const double[::1] rewards, const double[::1] visits,
+                             double log_n, double c) noexcept nogil:
+    cdef Py_ssize_t i, best = -1
+    cdef Py_ssize_t n = rewards.shape[0]
+    cdef double v, score, best_score = 0.0
+
+    for i in range(n):
+        if visits[i] == 0.0:
+            return i
+
+    for i in range(n):
+        v = visits[i]
+        score = rewards[i] / v + c * sqrt(log_n / v)
+        if best < 0 or score > best_score:
+            best = i
+            best_score = score
+    return best
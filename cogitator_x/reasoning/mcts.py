@@ -1,84 +1,332 @@
 import random
 import asyncio
 import math
+import sys
+import sysconfig
+from dataclasses import replace
 from typing import List, Optional, Callable
 from ..core.models import ThoughtNode, ReasoningState
+from ..utils.prompts import MixedCoTPrompter
 from .prm import ProcessRewardModel
+from .thought_cache import ThoughtCache
+from .ucb import best_child_index
+
+# On free-threaded builds (no GIL) worker threads run truly in parallel with
+# the event loop, so pure-Python tree walks are worth moving off it.
+FREE_THREADED = sys.version_info >= (3, 14) and bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
 
 class MCTSReasoningEngine:
+    # Below this branching factor select_child's plain loop beats the NumPy
+    # kernel: gathering child stats into arrays costs about as much as
+    # scoring them in Python (measured crossover ~500 children)
+    VECTORIZE_MIN_CHILDREN = 512
+    # Past this many root visits, tree walks are long enough that running
+    # them in a worker thread keeps the event loop (and other bus
+    # subscribers) responsive; free-threaded builds always offload
+    OFFLOAD_MIN_VISITS = 100
+
     def __init__(self,
                  prm: ProcessRewardModel,
                  generator: Callable,
                  max_iterations: int = 10,
-                 exploration_weight: float = 1.414):
+                 exploration_weight: float = 1.414,
+                 batch_size: int = 1,
+                 thought_cache: Optional[ThoughtCache] = None,
+                 early_stopping: bool = False,
+                 patience: int = 3,
+                 max_branching: Optional[int] = None):
         self.prm = prm
         self.generator = generator
         self.max_iterations = max_iterations
         self.exploration_weight = exploration_weight
+        # Simulations dispatched concurrently per iteration. Selected paths
+        # are marked in flight (WU-UCT on_going_count) until backpropagation
+        # so the rest of the batch is steered towards other branches.
+        self.batch_size = max(1, batch_size)
+        # Optional memo of generator steps and PRM scores for repeated contexts
+        self.thought_cache = thought_cache
+        # Stop before max_iterations once the root decision looks settled:
+        # the most visited first step leads by more than the remaining
+        # simulations could add, or it stayed the same for `patience`
+        # consecutive batches. Off by default since deeper steps of the best
+        # path keep improving with more iterations.
+        self.early_stopping = early_stopping
+        self.patience = max(1, patience)
+        # Upper bound on steps per generator call. With it the lead check is
+        # exact; without it the widest expansion seen so far stands in, which
+        # a later, wider expansion can exceed (a heuristic).
+        self.max_branching = max_branching
 
     async def run(self, state: ReasoningState):
+        return await self._run_single(state, self.max_iterations)
+
+    async def run_root_parallel(self, state: ReasoningState, k: int = 4) -> List[ThoughtNode]:
+        """
+        Root parallelization: grows `k` independent trees concurrently, each
+        with an even share of max_iterations, and keeps the tree whose most
+        visited first step accumulated the most reward.
+        The winning tree becomes state.thought_root.
+        """
+        k = max(1, k)
+        iterations = -(-self.max_iterations // k)  # ceil division
+        copies = [replace(state, thought_root=None, current_node=None) for _ in range(k)]
+        paths = await asyncio.gather(*(self._run_single(s, iterations) for s in copies))
+
+        def strength(path: List[ThoughtNode]) -> float:
+            # visit_count * mean reward == total_reward of the chosen first step
+            return path[0].total_reward if path else float('-inf')
+
+        best_index = max(range(k), key=lambda i: strength(paths[i]))
+        state.thought_root = copies[best_index].thought_root
+        return paths[best_index]
+
+    async def _run_single(self, state: ReasoningState, iterations: int) -> List[ThoughtNode]:
         if not state.thought_root:
             state.thought_root = ThoughtNode(text="Root", is_hidden=False)
             state.thought_root.visit_count = 1 # Prevent division by zero
 
-        for i in range(self.max_iterations):
-            # 1. Selection
-            leaf = self._select(state.thought_root)
+        remaining = iterations
+        max_fanout = 0
+        leader, stable_batches = None, 0
+        while remaining > 0:
+            batch = min(self.batch_size, remaining)
+            remaining -= batch
+
+            offload = FREE_THREADED or state.thought_root.visit_count > self.OFFLOAD_MIN_VISITS
 
-            # 2. Expansion
-            new_nodes = await self._expand(leaf, state)
+            # 1. Selection (in-flight marks keep the batch from piling onto one
+            # path, so the batch is selected sequentially as one unit)
+            leaves = await self._bookkeeping(offload, self._select_batch, state.thought_root, batch)
 
-            # 3. Simulation & Evaluation
-            for node in new_nodes:
-                score = await self.prm.score_step(state.query, self._get_path_texts(node), node.text)
-                node.prm_score = score
-                # 4. Backpropagation
-                self._backpropagate(node, score)
+            try:
+                # 2. Expansion: one generator call per distinct leaf, run concurrently
+                unique_leaves = list({id(leaf): leaf for leaf in leaves}.values())
+                if FREE_THREADED:
+                    # Read-only walks over disjoint leaves, safe to run side by side
+                    leaf_paths = await asyncio.gather(*(
+                        asyncio.to_thread(self._get_path_texts, leaf) for leaf in unique_leaves
+                    ))
+                else:
+                    leaf_paths = await self._bookkeeping(offload, self._get_paths_texts, unique_leaves)
+                expansions = await asyncio.gather(*(
+                    self._expand(leaf, state, path) for leaf, path in zip(unique_leaves, leaf_paths)
+                ))
+
+                # 3. Simulation & Evaluation: each new step is scored against the
+                # path that led to it, all in a single PRM batch
+                new_nodes = []
+                step_paths = []
+                for path, nodes in zip(leaf_paths, expansions):
+                    path_set = frozenset(path)
+                    new_nodes.extend(nodes)
+                    step_paths.extend([path_set] * len(nodes))
+                strip_thought = MixedCoTPrompter.strip_thought
+                steps = [strip_thought(node.text) for node in new_nodes]
+                token_ids_list = [node.token_ids for node in new_nodes] if self.prm.tokenizer is not None else None
+                scores = await self._score_steps(state.query, step_paths, steps, token_ids_list)
+
+                # 4. Backpropagation. Backprops share ancestors, so the whole stage
+                # runs as one unit rather than one thread per node.
+                await self._bookkeeping(offload, self._record_simulations, new_nodes, scores)
+            finally:
+                # Clear the in-flight marks even if a stage above failed, so a
+                # reused tree isn't left biased by phantom simulations
+                for leaf in leaves:
+                    self._complete_simulation(leaf)
+
+            if self.early_stopping:
+                # Each simulation adds one visit per expanded child to a single
+                # first step, so its lead must exceed what the rest could add
+                if self.max_branching is not None:
+                    max_fanout = self.max_branching
+                else:
+                    max_fanout = max(max_fanout, max(map(len, expansions), default=0))
+                current_leader, lead = self._root_leader(state.thought_root)
+                if current_leader is None:
+                    continue
+                if lead > remaining * max_fanout:
+                    break
+                stable_batches = stable_batches + 1 if current_leader is leader else 0
+                leader = current_leader
+                if stable_batches >= self.patience:
+                    break
 
         # Select best path
         best_path = self._get_best_path(state.thought_root)
         return best_path
 
+    @staticmethod
+    def _root_leader(root: ThoughtNode):
+        """
+        The most visited first step and its visit lead over the runner-up,
+        or (None, 0) while there is no choice to make yet.
+        """
+        if len(root.children) < 2:
+            return None, 0
+        first, second = sorted(root.children, key=lambda n: n.visit_count, reverse=True)[:2]
+        return first, first.visit_count - second.visit_count
+
+    def reuse_tree(self, state: ReasoningState, best_path: List[ThoughtNode]) -> Optional[ThoughtNode]:
+        """
+        Search-tree reuse for a follow-up turn: re-roots state.thought_root at
+        the first step of `best_path`, keeping its subtree and statistics,
+        and prunes every sibling subtree. The new root remembers the steps
+        above it (context_path) so they stay in the generator/PRM context. Returns the new root (None if the
+        path is empty, in which case the tree is left alone).
+        """
+        if not best_path or state.thought_root is None:
+            return None
+
+        kept = best_path[0]
+        # The subtree was grown with the kept step in context; carry it over
+        # so follow-up expansions still see it (and thought-cache keys match)
+        kept.context_path = tuple(self._get_path_texts(kept))
+        self._prune_untaken(state.thought_root, kept)
+        kept.parent = None
+        kept.parent_id = None
+        state.thought_root = kept
+        state.current_node = None
+        return kept
+
+    @staticmethod
+    def _prune_untaken(root: ThoughtNode, kept_child: ThoughtNode):
+        """
+        Detaches every child of `root` except `kept_child` and unlinks the
+        dropped subtrees, so they are freed by refcounting right away instead
+        of waiting for the cycle collector (parent <-> children links).
+        """
+        stack = [child for child in root.children if child is not kept_child]
+        root.children = [child for child in root.children if child is kept_child]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.children)
+            node.children.clear()
+            node.parent = None
+
+    @staticmethod
+    async def _bookkeeping(offload: bool, func: Callable, *args):
+        """
+        Runs a synchronous tree operation, in a worker thread when `offload`.
+        Only one runs at a time per search, since the caller awaits each.
+        """
+        if offload:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    def _select_batch(self, root: ThoughtNode, batch: int) -> List[ThoughtNode]:
+        return [self._select(root) for _ in range(batch)]
+
     def _select(self, node: ThoughtNode) -> ThoughtNode:
+        """
+        Descends by UCB1 and marks every node on the chosen path as having
+        one more simulation in flight; _complete_simulation undoes it.
+        """
+        node.on_going_count += 1
         while node.children:
             # Selection based on UCB1
-            node = max(node.children, key=lambda n: n.ucb1(node.visit_count, self.exploration_weight))
+            if len(node.children) >= self.VECTORIZE_MIN_CHILDREN:
+                node = node.children[self._best_child_index(node)]
+            else:
+                node = node.select_child(self.exploration_weight)
+            node.on_going_count += 1
         return node
 
-    async def _expand(self, node: ThoughtNode, state: ReasoningState) -> List[ThoughtNode]:
+    def _best_child_index(self, node: ThoughtNode) -> int:
+        """
+        Vectorized UCB1 over all children of `node`: gathers the sibling
+        metrics into arrays and scores them in one kernel call.
+        Unvisited children win first, matching ThoughtNode.ucb1's infinity.
+        """
+        return best_child_index(node, self.exploration_weight)
+
+    async def _expand(self, node: ThoughtNode, state: ReasoningState, path: Optional[List[str]] = None) -> List[ThoughtNode]:
         # Call the generator to get potential next thought steps
         # This simulates the "Adaptive Branching"
-        path = self._get_path_texts(node)
-        next_steps = await self.generator(state.query, path)
+        if path is None:
+            path = self._get_path_texts(node)
+        cache = self.thought_cache
+        next_steps = cache.get_steps(state.query, path) if cache is not None else None
+        if next_steps is None:
+            next_steps = await self.generator(state.query, path)
+            if cache is not None:
+                cache.put_steps(state.query, path, next_steps)
 
+        encode = self.prm.encode if self.prm.tokenizer is not None else None
+        strip_thought = MixedCoTPrompter.strip_thought
         new_nodes = []
         for step_text in next_steps:
-            new_node = ThoughtNode(text=step_text, parent_id=node.id)
-            new_node._parent_node = node # Link back for backprop
+            new_node = ThoughtNode(text=step_text, parent_id=node.id, parent=node)
+            if encode is not None:
+                new_node.token_ids = encode(strip_thought(step_text))
             node.children.append(new_node)
             new_nodes.append(new_node)
         return new_nodes
 
+    async def _score_steps(self,
+                           query: str,
+                           paths: List[frozenset],
+                           steps: List[str],
+                           token_ids_list: Optional[List] = None) -> List[float]:
+        """
+        Scores steps with one PRM batch, sending only the thought-cache misses.
+        """
+        cache = self.thought_cache
+        if cache is None:
+            return await self.prm.score_batch(query, paths, steps, token_ids_list)
+
+        scores = [cache.get_score(query, path, step) for path, step in zip(paths, steps)]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            fresh = await self.prm.score_batch(
+                query,
+                [paths[i] for i in missing],
+                [steps[i] for i in missing],
+                [token_ids_list[i] for i in missing] if token_ids_list is not None else None,
+            )
+            for i, score in zip(missing, fresh):
+                scores[i] = score
+                cache.put_score(query, paths[i], steps[i], score)
+        return scores
+
+    def _record_simulations(self, new_nodes: List[ThoughtNode], scores: List[float]):
+        for node, score in zip(new_nodes, scores):
+            node.prm_score = score
+            self._backpropagate(node, score)
+
     def _backpropagate(self, node: ThoughtNode, reward: float):
         curr = node
-        while curr:
+        while curr is not None:
             curr.visit_count += 1
             curr.total_reward += reward
-            if hasattr(curr, '_parent_node'):
-                curr = curr._parent_node
-            else:
-                break
+            curr = curr.parent
+
+    def _complete_simulation(self, leaf: ThoughtNode):
+        curr = leaf
+        while curr is not None:
+            curr.on_going_count -= 1
+            curr = curr.parent
+
+    def _get_paths_texts(self, nodes: List[ThoughtNode]) -> List[List[str]]:
+        return [self._get_path_texts(node) for node in nodes]
 
     def _get_path_texts(self, node: ThoughtNode) -> List[str]:
+        """
+        Step texts from the root down to `node`, as context for the generator
+        and PRM. <think> blocks are stripped; node.text keeps the full step.
+        """
+        strip_thought = MixedCoTPrompter.strip_thought
         path = []
         curr = node
-        while curr and curr.text != "Root":
-            path.append(curr.text)
-            if hasattr(curr, '_parent_node'):
-                curr = curr._parent_node
-            else:
-                break
-        return path[::-1]
+        # The root (the only node without a parent) carries no step text of
+        # its own, only the context_path it kept when it was re-rooted
+        while curr.parent is not None:
+            path.append(strip_thought(curr.text))
+            curr = curr.parent
+        # Reverse in place: no second list, unlike path[::-1] or list(deque)
+        path.reverse()
+        if curr.context_path:
+            path[:0] = curr.context_path
+        return path
 
     def _get_best_path(self, root: ThoughtNode) -> List[ThoughtNode]:
         path = []
@@ -1,17 +1,73 @@
-from typing import List
+import re
+from typing import Callable, Collection, FrozenSet, List, Optional, Sequence, Tuple
+import numpy as np
 from ..core.models import ThoughtNode
 
+# Logical connectors in English signal the 'English pivot' reasoning style
+_LOGICAL_KEYWORDS = frozenset(["therefore", "because", "implies", "if", "then", "let", "assume", "step"])
+
+# One pass over the text regardless of keyword count: an Aho-Corasick
+# automaton when pyahocorasick is installed, else a compiled alternation
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _kw in _LOGICAL_KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(_kw, _kw)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+    def _has_logical_keyword(lowered: str) -> bool:
+        return next(_KEYWORD_AUTOMATON.iter(lowered), None) is not None
+else:
+    _KEYWORD_SEARCH = re.compile("|".join(map(re.escape, sorted(_LOGICAL_KEYWORDS)))).search
+
+    def _has_logical_keyword(lowered: str) -> bool:
+        return _KEYWORD_SEARCH(lowered) is not None
+
 class ProcessRewardModel:
     """
     The 'Conscience' of Cogitator-X. Evaluates each step of reasoning.
     In a real implementation, this would be a 7B/8B model trained as a classifier.
     """
-    def __init__(self, model_name: str = "PRM-7B-Alpha"):
+    def __init__(self,
+                 model_name: str = "PRM-7B-Alpha",
+                 tokenizer: Optional[Callable[[str], Sequence[int]]] = None):
         self.model_name = model_name
+        # When set, MCTS tokenizes each step once at expansion (ThoughtNode.token_ids)
+        # and hands the ids to score_batch instead of the PRM re-tokenizing text
+        self.tokenizer = tokenizer
+
+    def encode(self, text: str) -> Optional[np.ndarray]:
+        if self.tokenizer is None:
+            return None
+        return np.asarray(self.tokenizer(text), dtype=np.int64)
 
-    async def score_step(self, context_prompt: str, reasoning_path: List[str], current_step: str) -> float:
+    @staticmethod
+    def pad_token_ids(token_ids_list: Sequence[np.ndarray], pad_id: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Right-pads pre-tokenized steps into one (batch, max_len) id matrix
+        plus the matching attention mask, ready for a batched forward pass.
+        """
+        lengths = np.fromiter((len(ids) for ids in token_ids_list), dtype=np.int64, count=len(token_ids_list))
+        max_len = int(lengths.max()) if lengths.size else 0
+        mask = np.arange(max_len) < lengths[:, None]
+        ids = np.full(mask.shape, pad_id, dtype=np.int64)
+        if lengths.size:
+            ids[mask] = np.concatenate(token_ids_list)
+        return ids, mask
+
+    async def score_step(self,
+                         context_prompt: str,
+                         reasoning_path: List[str],
+                         current_step: str,
+                         reasoning_path_set: Optional[FrozenSet[str]] = None) -> float:
         """
         Calculates a score [0.0, 1.0] for the current step given the context.
+        Callers scoring several steps against the same path can pass
+        `reasoning_path_set` to make the loop check O(1).
         """
         # Logic Simulation for the demo:
         # 1. English logic pivot check: Give higher scores to steps that use logical connectors in English.
@@ -20,17 +76,41 @@ class ProcessRewardModel:
         score = 0.5 # Baseline
 
         # Heuristic: Logical connectors in English increase 'reasoning quality' signal
-        logical_keywords = ["therefore", "because", "implies", "if", "then", "let", "assume", "step"]
-        if any(kw in current_step.lower() for kw in logical_keywords):
+        if _has_logical_keyword(current_step.lower()):
             score += 0.2
 
         # Heuristic: Avoid loops
-        if current_step in reasoning_path:
+        if current_step in (reasoning_path_set if reasoning_path_set is not None else reasoning_path):
             score -= 0.4
 
         # Final clamping
         return max(0.0, min(1.0, score))
 
+    async def score_batch(self,
+                          context_prompt: str,
+                          reasoning_paths: Sequence[Collection[str]],
+                          steps: Sequence[str],
+                          token_ids_list: Optional[Sequence[np.ndarray]] = None) -> List[float]:
+        """
+        Scores many candidate steps in one pass; steps[i] is judged against
+        reasoning_paths[i] (a list, or a set for O(1) loop checks).
+        A real PRM would run a single batched forward pass here, over
+        pad_token_ids(token_ids_list) when the steps come pre-tokenized; the
+        demo heuristic applies the score_step rules as one vectorized update.
+        """
+        n = len(steps)
+        if n == 0:
+            return []
+
+        has_keyword = np.fromiter(
+            (_has_logical_keyword(step.lower()) for step in steps), dtype=bool, count=n
+        )
+        is_loop = np.fromiter(
+            (step in path for step, path in zip(steps, reasoning_paths)), dtype=bool, count=n
+        )
+        scores = 0.5 + 0.2 * has_keyword - 0.4 * is_loop
+        return np.clip(scores, 0.0, 1.0).tolist()
+
     async def evaluate_path(self, nodes: List[ThoughtNode]) -> float:
         """
         Aggregated score for a full reasoning path.
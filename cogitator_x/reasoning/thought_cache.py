@@ -0,0 +1,63 @@
+from collections import OrderedDict
+from typing import Any, FrozenSet, Hashable, List, Optional, Sequence, Tuple
+
+class ThoughtCache:
+    """
+    Retrieval-of-Thought style memo for MCTS: remembers the generator's
+    next steps for a (query, recent path) context and the PRM score of a
+    step under a given path, so repeated contexts skip the model round-trip.
+
+    Contexts are matched exactly on the last `context_window` steps rather
+    than by embedding similarity. Both tables are bounded LRUs.
+    """
+    def __init__(self, max_entries: int = 4096, context_window: int = 2):
+        self.max_entries = max_entries
+        self.context_window = context_window
+        self._steps: "OrderedDict[Hashable, Tuple[str, ...]]" = OrderedDict()
+        self._scores: "OrderedDict[Hashable, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _steps_key(self, query: str, path: Sequence[str]) -> Hashable:
+        window = self.context_window
+        return (query, tuple(path[-window:]) if window > 0 else ())
+
+    def get_steps(self, query: str, path: Sequence[str]) -> Optional[List[str]]:
+        steps = self._lookup(self._steps, self._steps_key(query, path))
+        return list(steps) if steps is not None else None
+
+    def put_steps(self, query: str, path: Sequence[str], steps: Sequence[str]):
+        self._store(self._steps, self._steps_key(query, path), tuple(steps))
+
+    def get_score(self, query: str, path: FrozenSet[str], step: str) -> Optional[float]:
+        # The loop check looks at the whole path, so scores are keyed on all of it
+        return self._lookup(self._scores, (query, path, step))
+
+    def put_score(self, query: str, path: FrozenSet[str], step: str, score: float):
+        self._store(self._scores, (query, path, step), score)
+
+    def clear(self):
+        self._steps.clear()
+        self._scores.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, table: OrderedDict, key: Hashable) -> Optional[Any]:
+        value = table.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        table.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _store(self, table: OrderedDict, key: Hashable, value: Any):
+        table[key] = value
+        table.move_to_end(key)
+        if len(table) > self.max_entries:
+            table.popitem(last=False)
@@ -0,0 +1,66 @@
+import math
+from typing import List, Tuple
+import numpy as np
+from ..core.models import ThoughtNode
+
+try:
+    # Optional compiled kernel, see _ucb.pyx
+    from ._ucb import select_best as _compiled_select_best
+except ImportError:
+    _compiled_select_best = None
+
+if _compiled_select_best is None:
+    # Without a C toolchain, fall back to a Numba JIT of the same loop
+    # when numba is installed; otherwise ucb_argmax stays on NumPy.
+    try:
+        from numba import njit
+    except ImportError:
+        njit = None
+
+    if njit is not None:
+        @njit(cache=True, fastmath=True)
+        def _jit_select_best(rewards, visits, log_n, c):
+            n = rewards.shape[0]
+            for i in range(n):
+                if visits[i] == 0.0:
+                    return i
+            best = -1
+            best_score = 0.0
+            for i in range(n):
+                score = rewards[i] / visits[i] + c * math.sqrt(log_n / visits[i])
+                if best < 0 or score > best_score:
+                    best = i
+                    best_score = score
+            return best
+
+        # Compile (or load from the on-disk cache) now rather than mid-search
+        _jit_select_best(np.ones(1), np.ones(1), 0.0, 1.0)
+        _compiled_select_best = _jit_select_best
+
+def gather_child_stats(node: ThoughtNode) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Packs the children's metrics into contiguous structure-of-arrays form:
+    (total_reward, visit_count + on_going_count), both float64.
+    """
+    children: List[ThoughtNode] = node.children
+    n = len(children)
+    rewards = np.fromiter((c.total_reward for c in children), dtype=np.float64, count=n)
+    visits = np.fromiter((c.visit_count + c.on_going_count for c in children), dtype=np.float64, count=n)
+    return rewards, visits
+
+def ucb_argmax(rewards: np.ndarray, visits: np.ndarray, log_n: float, c: float) -> int:
+    """
+    Index of the highest UCB1 score over sibling arrays.
+    Unvisited entries (visits == 0) are picked first, lowest index wins ties.
+    """
+    if _compiled_select_best is not None:
+        return int(_compiled_select_best(rewards, visits, log_n, c))
+    unvisited = np.flatnonzero(visits == 0)
+    if unvisited.size:
+        return int(unvisited[0])
+    return int((rewards / visits + c * np.sqrt(log_n / visits)).argmax())
+
+def best_child_index(node: ThoughtNode, exploration_weight: float) -> int:
+    rewards, visits = gather_child_stats(node)
+    log_n = math.log1p(node.visit_count + node.on_going_count)
+    return ucb_argmax(rewards, visits, log_n, exploration_weight)
@@ -0,0 +1,23 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+def configure_queue_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Routes root logging through a QueueHandler so agents running on the
+    event loop only enqueue records; a background QueueListener thread does
+    the formatting and the blocking write to stderr.
+    The caller owns the returned listener and should stop() it on shutdown.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -1,5 +1,8 @@
+import re
 from typing import List
 
+_THINK_RE = re.compile(r'<think>(.*?)</think>', re.DOTALL)
+
 class MixedCoTPrompter:
     """
     Utility to implement the 'Language-Mixed Chain-of-Thought' (English Pivot) strategy.
@@ -33,8 +36,17 @@ To solve complex problems in non-English languages, follow these rules:
         """
         Extracts content from <think> tags if present.
         """
-        import re
-        match = re.search(r'<think>(.*?)</think>', model_output, re.DOTALL)
+        match = _THINK_RE.search(model_output)
         if match:
             return match.group(1).strip()
         return model_output.strip()
+
+    @staticmethod
+    def strip_thought(text: str) -> str:
+        """
+        Removes <think> blocks, keeping only the step's visible text.
+        Used for prompt/PRM context, where the monologue only costs tokens.
+        """
+        if '<think>' not in text:
+            return text
+        return _THINK_RE.sub('', text).strip()
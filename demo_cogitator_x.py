@@ -6,6 +6,7 @@ from cogitator_x.reasoning.prm import ProcessRewardModel
 from cogitator_x.reasoning.mcts import MCTSReasoningEngine
 from cogitator_x.agents.orchestrator import AgioSageAgent
 from cogitator_x.agents.evolution import PangenesAgent
+from cogitator_x.utils.log import configure_queue_logging
 
 async def mock_llm_generator(query, path):
     """
@@ -77,4 +78,8 @@ async def main():
     print("=== Demo Complete ===")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    log_listener = configure_queue_logging()
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()
@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+from cogitator_x.agents.evolution import PangenesAgent
+from cogitator_x.agents.orchestrator import AgioSageAgent
+from cogitator_x.core.bus import AetherBus
+from cogitator_x.core.models import Message
+from cogitator_x.reasoning.mcts import MCTSReasoningEngine
+from cogitator_x.reasoning.prm import ProcessRewardModel
+
+class TestPangenesAgent(unittest.IsolatedAsyncioTestCase):
+    async def test_evolution_cycle_triggers_every_batch(self):
+        bus = AetherBus()
+        agent = PangenesAgent(bus)
+        generations = []
+
+        async def on_evolved(msg):
+            generations.append(msg.content["generation"])
+
+        bus.subscribe("system.evolution_complete", on_evolved)
+
+        response = Message(
+            topic="query.response",
+            content={"answer": "42", "thought_trace": ["step"], "query": "q"},
+        )
+        for _ in range(PangenesAgent.EVOLUTION_BATCH_SIZE * 2 - 1):
+            await agent.harvest_wisdom(response)
+
+        self.assertEqual(generations, ["N+1"])
+        self.assertEqual(len(agent.wisdom_gems), PangenesAgent.EVOLUTION_BATCH_SIZE - 1)
+
+class TestAgioSageAgent(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_follow_ups_do_not_share_the_carried_tree(self):
+        async def mock_gen(query, path):
+            await asyncio.sleep(0)  # let concurrent searches interleave
+            return [f"Step {len(path) + 1}a", f"Step {len(path) + 1}b"] if len(path) < 4 else []
+
+        bus = AetherBus()
+        engine = MCTSReasoningEngine(ProcessRewardModel(), mock_gen, max_iterations=6, batch_size=2)
+        agent = AgioSageAgent(bus, engine)
+        roots = []
+        original_run = engine.run
+
+        async def spy_run(state):
+            roots.append(state.thought_root)
+            return await original_run(state)
+
+        engine.run = spy_run
+
+        await agent.handle_query(Message(topic="query.submit", content={"text": "q"}))
+        carried = agent._carry_over_root
+        self.assertIsNotNone(carried)
+
+        follow_up = Message(topic="query.submit", content={"text": "q2", "follow_up": True})
+        await asyncio.gather(agent.handle_query(follow_up), agent.handle_query(follow_up))
+
+        # Only one follow-up got the carried tree; the other started fresh
+        self.assertEqual(sum(root is carried for root in roots[1:]), 1)
+        self.assertEqual(sum(root is None for root in roots[1:]), 1)
+
+        def all_nodes(node):
+            yield node
+            for child in node.children:
+                yield from all_nodes(child)
+
+        self.assertTrue(all(n.on_going_count == 0 for n in all_nodes(carried)))
+
+if __name__ == "__main__":
+    unittest.main()
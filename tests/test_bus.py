@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import unittest
+from cogitator_x.core.bus import AetherBus
+from cogitator_x.core.models import Message
+
+class TestAetherBus(unittest.IsolatedAsyncioTestCase):
+    async def test_publish_dispatches_sync_and_async_subscribers(self):
+        bus = AetherBus()
+        received = []
+
+        def on_sync(msg):
+            received.append(("sync", msg.content["n"]))
+
+        async def on_async(msg):
+            received.append(("async", msg.content["n"]))
+
+        bus.subscribe("topic", on_sync)
+        bus.subscribe("topic", on_async)
+
+        await bus.publish(Message(topic="topic", content={"n": 1}))
+        await bus.publish(Message(topic="other", content={"n": 2}))
+
+        self.assertCountEqual(received, [("sync", 1), ("async", 1)])
+
+    async def test_non_blocking_sync_subscriber_runs_inline(self):
+        bus = AetherBus()
+        threads = {}
+
+        def on_blocking(msg):
+            threads["blocking"] = threading.get_ident()
+
+        def on_inline(msg):
+            threads["inline"] = threading.get_ident()
+
+        bus.subscribe("topic", on_blocking)
+        bus.subscribe("topic", on_inline, blocking=False)
+
+        await bus.publish(Message(topic="topic"))
+
+        self.assertEqual(threads["inline"], threading.get_ident())
+        self.assertNotEqual(threads["blocking"], threading.get_ident())
+
+    async def test_sync_callable_returning_coroutine_is_awaited(self):
+        bus = AetherBus()
+        received = []
+
+        async def record(msg, mode):
+            received.append(mode)
+
+        bus.subscribe("topic", lambda msg: record(msg, "executor"))
+        bus.subscribe("topic", lambda msg: record(msg, "inline"), blocking=False)
+
+        await bus.publish(Message(topic="topic"))
+
+        self.assertCountEqual(received, ["executor", "inline"])
+
+    async def test_unsubscribe_stops_delivery(self):
+        bus = AetherBus()
+        received = []
+
+        async def on_async(msg):
+            received.append(msg.content["n"])
+
+        bus.subscribe("topic", on_async)
+        await bus.publish(Message(topic="topic", content={"n": 1}))
+        bus.unsubscribe("topic", on_async)
+        await bus.publish(Message(topic="topic", content={"n": 2}))
+
+        self.assertEqual(received, [1])
+
+    async def test_subscribe_during_publish_applies_to_next_message(self):
+        bus = AetherBus()
+        received = []
+
+        def late(msg):
+            received.append(("late", msg.content["n"]))
+
+        def first(msg):
+            received.append(("first", msg.content["n"]))
+            bus.subscribe("topic", late, blocking=False)
+
+        bus.subscribe("topic", first, blocking=False)
+
+        await bus.publish(Message(topic="topic", content={"n": 1}))
+        await bus.publish(Message(topic="topic", content={"n": 2}))
+
+        self.assertEqual(received, [("first", 1), ("first", 2), ("late", 2)])
+
+    async def test_request_resolves_with_responder_reply(self):
+        bus = AetherBus()
+        seen = []
+
+        async def responder(msg):
+            seen.append(msg.content["n"])
+            await bus.publish(Message(
+                topic="topic.reply",
+                content={"correlation_id": msg.content["correlation_id"], "n": msg.content["n"] * 2},
+            ))
+
+        bus.subscribe("topic", responder)
+
+        reply = await bus.request("topic", {"n": 1}, timeout=1.0)
+
+        self.assertEqual(seen, [1])
+        self.assertEqual(reply.topic, "topic.reply")
+        self.assertEqual(reply.content["n"], 2)
+        self.assertEqual(bus.futures, {})
+
+    async def test_request_clears_pending_future_on_timeout(self):
+        bus = AetherBus()
+
+        with self.assertRaises(TimeoutError):
+            await bus.request("topic", {"n": 1}, timeout=0.01)
+
+        self.assertEqual(bus.futures, {})
+
+    async def test_request_timeout_bounds_slow_subscribers(self):
+        bus = AetherBus()
+        loop = asyncio.get_running_loop()
+        cancelled = []
+
+        async def slow_silent(msg):
+            try:
+                await asyncio.sleep(2)
+            except asyncio.CancelledError:
+                cancelled.append(msg.content["n"])
+                raise
+
+        async def slow_responder(msg):
+            await asyncio.sleep(1)
+            await bus.publish(Message(topic="reply", content={"correlation_id": msg.content["correlation_id"]}))
+
+        bus.subscribe("silent", slow_silent)
+        bus.subscribe("slow", slow_responder)
+
+        for topic in ("silent", "slow"):
+            start = loop.time()
+            with self.assertRaises(TimeoutError):
+                await bus.request(topic, {"n": 1}, timeout=0.1)
+            self.assertLess(loop.time() - start, 0.5)
+
+        self.assertEqual(cancelled, [1])
+        self.assertEqual(bus.futures, {})
+
+    async def test_request_propagates_subscriber_errors(self):
+        bus = AetherBus()
+
+        async def failing(msg):
+            raise ValueError("boom")
+
+        bus.subscribe("topic", failing)
+
+        with self.assertRaises(ValueError):
+            await bus.request("topic", {}, timeout=1.0)
+        self.assertEqual(bus.futures, {})
+
+if __name__ == "__main__":
+    unittest.main()
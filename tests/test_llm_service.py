@@ -1,10 +1,25 @@
 import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import litellm
 
 from app.db import LLMConfig, ProviderType, SearchSpace
-from app.services.llm_service import get_fast_llm, get_text_embedding, validate_llm_config
+from app.services.llm_service import (
+    LLMRole,
+    _EMBEDDING_CACHE,
+    _GLOBAL_LLM_BUILDERS,
+    _VALIDATION_CACHE,
+    _build_model_string,
+    _provider_prefix,
+    close_http_client,
+    get_fast_llm,
+    get_global_llm_config,
+    get_text_embedding,
+    invalidate_llm_cache,
+    start_http_client,
+    validate_llm_config,
+)
 
 
 def test_get_fast_llm():
@@ -20,22 +35,52 @@ def test_get_fast_llm():
         litellm_params={},
     )
 
-    mock_result_ss = MagicMock()
-    mock_result_ss.scalars.return_value.first.return_value = mock_search_space
-
-    mock_result_lc = MagicMock()
-    mock_result_lc.scalars.return_value.first.return_value = mock_llm_config
-
-    mock_session.execute.side_effect = [mock_result_ss, mock_result_lc]
+    mock_result = MagicMock()
+    mock_result.first.return_value = (mock_search_space, mock_llm_config)
+    mock_session.execute.return_value = mock_result
 
     with patch("app.services.llm_service.ChatLiteLLM") as mock_chat_litellm:
         llm = asyncio.run(get_fast_llm(mock_session, 1))
 
     assert llm is mock_chat_litellm.return_value
     assert mock_chat_litellm.call_args.kwargs["model"] == "openai/gpt-3.5-turbo"
+    assert mock_session.execute.await_count == 1
+
+    asyncio.run(invalidate_llm_cache(1))
+
+
+def test_get_fast_llm_is_cached_until_invalidated():
+    _GLOBAL_LLM_BUILDERS.clear()
+    mock_session = AsyncMock()
+
+    mock_result = MagicMock()
+    mock_result.first.return_value = (SearchSpace(id=2, fast_llm_id=-1), None)
+    mock_session.execute.return_value = mock_result
+
+    with patch("app.services.llm_service.ChatLiteLLM") as mock_chat_litellm:
+        first = asyncio.run(get_fast_llm(mock_session, 2))
+        second = asyncio.run(get_fast_llm(mock_session, 2))
+
+        assert first is second
+        assert mock_chat_litellm.call_count == 1
+        assert mock_session.execute.await_count == 1
+
+        asyncio.run(invalidate_llm_cache(2, LLMRole.FAST))
+        asyncio.run(get_fast_llm(mock_session, 2))
+
+    assert mock_chat_litellm.call_count == 2
+    assert mock_session.execute.await_count == 2
+    assert mock_chat_litellm.call_args.kwargs["model"] == "openai/gpt-4o"
+    assert mock_chat_litellm.call_args.kwargs["temperature"] == 0.5
+    assert mock_chat_litellm.call_args.kwargs["metadata"]["role"] == LLMRole.FAST
+
+    asyncio.run(invalidate_llm_cache(2))
+    _GLOBAL_LLM_BUILDERS.clear()
 
 
 def test_validate_llm_config():
+    _VALIDATION_CACHE.clear()
+
     with patch("app.services.llm_service.ChatLiteLLM") as mock_chat_litellm:
         mock_instance = mock_chat_litellm.return_value
 
@@ -63,6 +108,7 @@ def test_validate_llm_config():
             )
 
         mock_instance.ainvoke = async_auth_error
+        _VALIDATION_CACHE.clear()
 
         is_valid, error = asyncio.run(
             validate_llm_config(
@@ -91,6 +137,8 @@ def test_validate_llm_config():
 
 
 def test_get_text_embedding_provider_aliases():
+    _EMBEDDING_CACHE.clear()
+
     with patch("app.services.llm_service.litellm_embedding") as mock_embedding:
         mock_embedding.return_value = {"data": [{"embedding": [0.1, 0.2, 0.3]}]}
 
@@ -120,6 +168,8 @@ def test_get_text_embedding_provider_aliases():
 
 
 def test_get_text_embedding():
+    _EMBEDDING_CACHE.clear()
+
     with patch("app.services.llm_service.litellm_embedding") as mock_embedding:
         mock_embedding.return_value = {"data": [{"embedding": [0.1, 0.2, 0.3]}]}
 
@@ -153,3 +203,130 @@ def test_get_text_embedding():
         assert isinstance(embeddings, list)
         assert len(embeddings) == 2
         assert embeddings[0] == [0.1, 0.2, 0.3]
+
+
+def test_build_model_string_is_memoized():
+    _build_model_string.cache_clear()
+
+    first = _build_model_string("gpt-4o", ProviderType.OPENAI)
+    second = _build_model_string("gpt-4o", ProviderType.OPENAI)
+
+    assert first == "openai/gpt-4o"
+    assert second is first
+    assert _build_model_string.cache_info().hits == 1
+    assert _build_model_string("llama3", "OLLAMA", "custom") == "custom/llama3"
+
+
+def test_get_global_llm_config_uses_id_index():
+    assert get_global_llm_config(-1)["model_name"] == "gpt-4o"
+    assert get_global_llm_config(-999) is None
+    assert get_global_llm_config(1) is None
+
+
+def test_get_text_embedding_is_cached():
+    _EMBEDDING_CACHE.clear()
+
+    with patch("app.services.llm_service.litellm_embedding") as mock_embedding:
+        mock_embedding.return_value = {"data": [{"embedding": [0.1, 0.2, 0.3]}]}
+
+        for _ in range(2):
+            embedding = asyncio.run(
+                get_text_embedding(
+                    text="cached",
+                    model_name="text-embedding-3-small",
+                    api_key="sk-test",
+                )
+            )
+            assert embedding == [0.1, 0.2, 0.3]
+
+        assert mock_embedding.call_count == 1
+
+        # Mutating a returned embedding must not corrupt the cached entry
+        embedding.append(9.9)
+        embedding[0] = 0.0
+        assert asyncio.run(
+            get_text_embedding(
+                text="cached",
+                model_name="text-embedding-3-small",
+                api_key="sk-test",
+            )
+        ) == [0.1, 0.2, 0.3]
+        assert mock_embedding.call_count == 1
+
+        asyncio.run(
+            get_text_embedding(
+                text="cached",
+                model_name="text-embedding-3-large",
+                api_key="sk-test",
+            )
+        )
+
+        assert mock_embedding.call_count == 2
+
+
+def test_provider_prefix_accepts_enum_and_string_spellings():
+    assert _provider_prefix(ProviderType.GOOGLE) == "gemini"
+    assert _provider_prefix("GOOGLE") == "gemini"
+    assert _provider_prefix("google") == "gemini"
+    assert _provider_prefix("Google") == "gemini"
+    assert _provider_prefix("DEEPSEEK") == "openai"
+    assert _provider_prefix("my_provider") == "my_provider"
+
+
+def test_validate_llm_config_reuses_cached_result():
+    _VALIDATION_CACHE.clear()
+
+    with patch("app.services.llm_service.ChatLiteLLM") as mock_chat_litellm:
+        calls = []
+
+        async def async_success(*args, **kwargs):
+            calls.append(args)
+            return MagicMock(content="ok")
+
+        mock_chat_litellm.return_value.ainvoke = async_success
+
+        for _ in range(2):
+            assert asyncio.run(
+                validate_llm_config(
+                    provider="OPENAI",
+                    model_name="gpt-4",
+                    api_key="sk-test-key",
+                    litellm_params={"temperature": 0.1},
+                )
+            ) == (True, "")
+
+        assert len(calls) == 1
+
+        asyncio.run(
+            validate_llm_config(
+                provider="OPENAI",
+                model_name="gpt-4",
+                api_key="sk-other-key",
+                litellm_params={"temperature": 0.1},
+            )
+        )
+
+        assert len(calls) == 2
+
+
+def test_shared_http_client_is_scoped_to_startup_and_shutdown_hooks():
+    # Importing the service must not install a client bound to no loop
+    previous = litellm.aclient_session
+    assert not isinstance(previous, httpx.AsyncClient)
+
+    clients = []
+
+    async def app_lifecycle():
+        client = await start_http_client()
+        assert await start_http_client() is client
+        assert litellm.aclient_session is client
+        clients.append(client)
+        await close_http_client()
+
+    # Each event loop gets its own client; none outlives its loop
+    asyncio.run(app_lifecycle())
+    asyncio.run(app_lifecycle())
+
+    assert clients[0] is not clients[1]
+    assert all(client.is_closed for client in clients)
+    assert litellm.aclient_session is previous
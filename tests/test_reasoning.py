@@ -1,8 +1,14 @@
 import asyncio
+import math
 import unittest
+from unittest.mock import AsyncMock, patch
+import numpy as np
 from cogitator_x.core.models import ReasoningState, ThoughtNode
 from cogitator_x.reasoning.mcts import MCTSReasoningEngine
 from cogitator_x.reasoning.prm import ProcessRewardModel
+from cogitator_x.reasoning.thought_cache import ThoughtCache
+from cogitator_x.reasoning.ucb import ucb_argmax
+from cogitator_x.utils.prompts import MixedCoTPrompter
 
 class TestModels(unittest.TestCase):
     def test_thought_node_creation(self):
@@ -11,12 +17,56 @@ class TestModels(unittest.TestCase):
         self.assertEqual(node.language, "th")
         self.assertEqual(node.visit_count, 0)
 
+    def test_thought_node_uses_slots(self):
+        node = ThoughtNode(text="Test thought")
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_reasoning_state_creation(self):
         state = ReasoningState(query="Test Query")
         self.assertEqual(state.query, "Test Query")
         self.assertIsNone(state.thought_root)
         self.assertFalse(state.is_complete)
 
+class TestUCBKernel(unittest.TestCase):
+    def test_ucb_argmax(self):
+        rewards = np.array([3.0, 1.5, 0.2])
+        visits = np.array([6.0, 2.0, 2.0])
+        self.assertEqual(ucb_argmax(rewards, visits, math.log1p(10), 1.414), 1)
+
+        visits[2] = 0.0
+        self.assertEqual(ucb_argmax(rewards, visits, math.log1p(10), 1.414), 2)
+
+class TestPRM(unittest.IsolatedAsyncioTestCase):
+    async def test_score_step_heuristics(self):
+        prm = ProcessRewardModel()
+        path = ["Let x = 2", "Therefore y = 4"]
+
+        self.assertAlmostEqual(await prm.score_step("q", path, "Because x is even"), 0.7)
+        self.assertAlmostEqual(await prm.score_step("q", path, "Plain statement"), 0.5)
+        self.assertAlmostEqual(await prm.score_step("q", path, "Let x = 2", frozenset(path)), 0.3)
+
+    async def test_score_batch_matches_score_step(self):
+        prm = ProcessRewardModel()
+        path = ["Let x = 2", "Therefore y = 4"]
+        steps = ["Because x is even", "Plain statement", "Let x = 2", "Then y = 4"]
+
+        expected = [await prm.score_step("q", path, step) for step in steps]
+        batch = await prm.score_batch("q", [frozenset(path)] * len(steps), steps)
+
+        self.assertEqual(batch, expected)
+        self.assertEqual(await prm.score_batch("q", [], []), [])
+
+    def test_pad_token_ids_builds_ids_and_mask(self):
+        ids, mask = ProcessRewardModel.pad_token_ids([np.array([5, 6, 7]), np.array([8])], pad_id=0)
+
+        np.testing.assert_array_equal(ids, [[5, 6, 7], [8, 0, 0]])
+        np.testing.assert_array_equal(mask, [[True, True, True], [True, False, False]])
+
+class TestPrompter(unittest.TestCase):
+    def test_strip_thought_removes_think_blocks(self):
+        self.assertEqual(MixedCoTPrompter.strip_thought("<think>15+27</think> The sum is 42."), "The sum is 42.")
+        self.assertEqual(MixedCoTPrompter.strip_thought("No tags here"), "No tags here")
+
 class TestMCTS(unittest.IsolatedAsyncioTestCase):
     async def test_mcts_flow(self):
         async def mock_gen(q, p):
@@ -30,5 +80,273 @@ class TestMCTS(unittest.IsolatedAsyncioTestCase):
         self.assertTrue(len(path) > 0)
         self.assertIn("Thought", path[0].text)
 
+    async def test_reuse_tree_reroots_at_best_step_and_prunes_siblings(self):
+        generator_paths = []
+
+        async def mock_gen(q, p):
+            generator_paths.append(list(p))
+            return ["Thought 1", "Thought 2"] if len(p) < 6 else []
+
+        engine = MCTSReasoningEngine(ProcessRewardModel(), mock_gen, max_iterations=6)
+        state = ReasoningState(query="Test Query")
+        path = await engine.run(state)
+        old_root = state.thought_root
+        kept = path[0]
+        dropped = [c for c in old_root.children if c is not kept]
+        kept_visits = kept.visit_count
+
+        self.assertIs(engine.reuse_tree(state, path), kept)
+        self.assertIs(state.thought_root, kept)
+        self.assertIsNone(kept.parent)
+        self.assertEqual(len(old_root.children), 1)
+        self.assertTrue(all(d.parent is None and not d.children for d in dropped))
+
+        # The next turn keeps searching from the reused statistics, with the
+        # kept step still leading the generator context
+        generator_paths.clear()
+        await engine.run(state)
+        self.assertGreater(state.thought_root.visit_count, kept_visits)
+        self.assertTrue(generator_paths)
+        self.assertTrue(all(p[:1] == [kept.text] for p in generator_paths))
+
+        # Re-rooting again keeps the whole committed chain
+        follow_up_path = await engine.run(state)
+        next_kept = follow_up_path[0]
+        engine.reuse_tree(state, follow_up_path)
+        self.assertEqual(engine._get_path_texts(next_kept), [kept.text, next_kept.text])
+
+    async def test_failed_simulation_clears_in_flight_marks(self):
+        calls = 0
+
+        async def flaky_gen(q, p):
+            nonlocal calls
+            calls += 1
+            if calls == 3:
+                raise RuntimeError("generator unavailable")
+            return ["a", "b"]
+
+        engine = MCTSReasoningEngine(ProcessRewardModel(), flaky_gen, max_iterations=5)
+        state = ReasoningState(query="q")
+        with self.assertRaises(RuntimeError):
+            await engine.run(state)
+
+        def all_nodes(node):
+            yield node
+            for child in node.children:
+                yield from all_nodes(child)
+
+        self.assertTrue(all(n.on_going_count == 0 for n in all_nodes(state.thought_root)))
+
+    async def test_batched_run_expands_leaves_concurrently(self):
+        in_flight = 0
+        peak = 0
+
+        async def mock_gen(q, p):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return [f"Thought {len(p)}a", f"Thought {len(p)}b"]
+
+        engine = MCTSReasoningEngine(
+            prm=ProcessRewardModel(), generator=mock_gen, max_iterations=7, batch_size=3
+        )
+        state = ReasoningState(query="Test Query")
+
+        path = await engine.run(state)
+
+        self.assertTrue(len(path) > 0)
+        self.assertGreater(peak, 1)
+        # Root visits = 1 + one per scored node, and nothing is left in flight
+        nodes = list(self._walk(state.thought_root))
+        self.assertEqual(state.thought_root.visit_count, len(nodes))
+        self.assertTrue(all(n.on_going_count == 0 for n in nodes))
+
+    async def test_root_parallel_run_keeps_strongest_tree(self):
+        async def mock_gen(q, p):
+            return ["Thought because", "Thought plain"] if len(p) < 2 else []
+
+        engine = MCTSReasoningEngine(prm=ProcessRewardModel(), generator=mock_gen, max_iterations=8)
+        state = ReasoningState(query="Test Query")
+
+        path = await engine.run_root_parallel(state, k=4)
+
+        self.assertTrue(len(path) > 0)
+        self.assertIs(path[0].parent, state.thought_root)
+        self.assertEqual(path[0].text, "Thought because")
+
+    def _walk(self, node):
+        yield node
+        for child in node.children:
+            yield from self._walk(child)
+
+    async def test_thought_cache_skips_repeated_generator_and_prm_calls(self):
+        generator_calls = []
+
+        async def generator(query, path):
+            generator_calls.append(tuple(path))
+            return ["Step A", "Step B"] if len(path) < 2 else []
+
+        prm = ProcessRewardModel()
+        cache = ThoughtCache()
+        for _ in range(2):
+            engine = MCTSReasoningEngine(prm, generator, max_iterations=4, thought_cache=cache)
+            await engine.run(ReasoningState(query="q"))
+
+        # The second run replays the first from the cache
+        self.assertEqual(len(generator_calls), len(set(generator_calls)))
+        self.assertGreater(cache.cache_hit_ratio, 0.0)
+        self.assertEqual(cache.get_score("q", frozenset(), "Step A"), await prm.score_step("q", [], "Step A"))
+
+    async def test_steps_are_tokenized_once_at_expansion(self):
+        tokenized = []
+
+        def tokenizer(text):
+            tokenized.append(text)
+            return [len(text)]
+
+        async def mock_gen(q, p):
+            return ["<think>x</think>Thought 1", "Thought 2"] if not p else []
+
+        prm = ProcessRewardModel(tokenizer=tokenizer)
+        seen = []
+        original_score_batch = prm.score_batch
+
+        async def spy_score_batch(query, paths, steps, token_ids_list=None):
+            seen.extend(token_ids_list)
+            return await original_score_batch(query, paths, steps, token_ids_list)
+
+        prm.score_batch = spy_score_batch
+        engine = MCTSReasoningEngine(prm, mock_gen, max_iterations=3)
+        state = ReasoningState(query="q")
+        await engine.run(state)
+
+        self.assertEqual(tokenized, ["Thought 1", "Thought 2"])
+        self.assertEqual([ids.tolist() for ids in seen], [[9], [9]])
+        self.assertIs(seen[0], state.thought_root.children[0].token_ids)
+
+    async def test_early_stopping_ends_search_once_root_choice_settles(self):
+        calls = 0
+
+        async def mock_gen(q, p):
+            nonlocal calls
+            calls += 1
+            return ["Therefore x", "Plain x"]
+
+        engine = MCTSReasoningEngine(ProcessRewardModel(), mock_gen, max_iterations=40)
+        await engine.run(ReasoningState(query="q"))
+        self.assertEqual(calls, 40)
+
+        calls = 0
+        engine = MCTSReasoningEngine(ProcessRewardModel(), mock_gen, max_iterations=40,
+                                     early_stopping=True, patience=3)
+        path = await engine.run(ReasoningState(query="q"))
+        self.assertLess(calls, 40)
+        self.assertEqual(path[0].text, "Therefore x")
+
+    async def test_early_stopping_dominance_respects_max_branching(self):
+        async def mock_gen(q, p):
+            return ["Therefore x", "Plain x"] if not p else ["Therefore y"]
+
+        calls = {}
+        for max_branching in (None, 100):
+            engine = MCTSReasoningEngine(ProcessRewardModel(), mock_gen, max_iterations=40,
+                                         exploration_weight=0.1, early_stopping=True,
+                                         patience=1000, max_branching=max_branching)
+            engine.generator = AsyncMock(side_effect=mock_gen)
+            await engine.run(ReasoningState(query="q"))
+            calls[max_branching] = engine.generator.await_count
+
+        # The observed fanout (2) lets the lead settle the search early; a
+        # declared bound of 100 steps per call can't be ruled out in time
+        self.assertLess(calls[None], 40)
+        self.assertEqual(calls[100], 40)
+
+    async def test_threaded_bookkeeping_matches_inline_run(self):
+        async def mock_gen(q, p):
+            return [f"Thought {len(p)}a", f"Thought {len(p)}b"] if len(p) < 3 else []
+
+        def visits(node):
+            return [node.visit_count] + [v for c in node.children for v in visits(c)]
+
+        results = []
+        for free_threaded, offload_min_visits in ((False, 10**9), (True, 10**9), (False, 0)):
+            with patch("cogitator_x.reasoning.mcts.FREE_THREADED", free_threaded):
+                engine = MCTSReasoningEngine(ProcessRewardModel(), mock_gen, max_iterations=6, batch_size=2)
+                engine.OFFLOAD_MIN_VISITS = offload_min_visits
+                state = ReasoningState(query="q")
+                path = await engine.run(state)
+            results.append(([n.text for n in path], visits(state.thought_root)))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+    def test_select_picks_max_ucb1_child(self):
+        async def mock_gen(q, p):
+            return []
+
+        engine = MCTSReasoningEngine(prm=ProcessRewardModel(), generator=mock_gen)
+        root = ThoughtNode(text="Root", visit_count=10)
+        root.children = [
+            ThoughtNode(text="a", visit_count=6, total_reward=3.0),
+            ThoughtNode(text="b", visit_count=2, total_reward=1.5),
+            ThoughtNode(text="c", visit_count=2, total_reward=0.2),
+        ]
+
+        expected = max(root.children, key=lambda n: n.ucb1(root.visit_count, engine.exploration_weight))
+        self.assertIs(engine._select(root), expected)
+
+        root.children.append(ThoughtNode(text="d"))
+        self.assertEqual(engine._select(root).text, "d")
+
+    def test_vectorized_selection_matches_select_child(self):
+        async def mock_gen(q, p):
+            return []
+
+        engine = MCTSReasoningEngine(prm=ProcessRewardModel(), generator=mock_gen)
+        root = ThoughtNode(text="Root", visit_count=100)
+        root.children = [
+            ThoughtNode(text=str(i), visit_count=1 + (i * 7) % 11, total_reward=(i * 0.37) % 3)
+            for i in range(engine.VECTORIZE_MIN_CHILDREN * 2)
+        ]
+
+        best = root.children[engine._best_child_index(root)]
+        self.assertIs(best, root.select_child(engine.exploration_weight))
+        self.assertIs(engine._select(root), best)
+
+    def test_in_flight_selection_diverts_next_selection(self):
+        async def mock_gen(q, p):
+            return []
+
+        engine = MCTSReasoningEngine(prm=ProcessRewardModel(), generator=mock_gen)
+        root = ThoughtNode(text="Root", visit_count=4)
+        a = ThoughtNode(text="a", visit_count=2, total_reward=1.2, parent=root)
+        b = ThoughtNode(text="b", visit_count=2, total_reward=1.0, parent=root)
+        root.children = [a, b]
+
+        first = engine._select(root)
+        second = engine._select(root)
+
+        self.assertIs(first, a)
+        self.assertIs(second, b)
+        self.assertEqual(root.on_going_count, 2)
+
+        engine._complete_simulation(first)
+        engine._complete_simulation(second)
+        self.assertEqual((root.on_going_count, a.on_going_count, b.on_going_count), (0, 0, 0))
+
+    def test_path_texts_follow_parent_links(self):
+        async def mock_gen(q, p):
+            return []
+
+        engine = MCTSReasoningEngine(prm=ProcessRewardModel(), generator=mock_gen)
+        root = ThoughtNode(text="Root")
+        first = ThoughtNode(text="first", parent=root)
+        second = ThoughtNode(text="<think>scratch work</think>second", parent=first)
+
+        self.assertEqual(engine._get_path_texts(second), ["first", "second"])
+        self.assertEqual(engine._get_path_texts(root), [])
+
 if __name__ == "__main__":
     unittest.main()